@@ -4,6 +4,8 @@ from scipy.optimize import minimize
 import pandas as pd
 import numpy as np
 
+from ._moments import masked_moments, nearest_psd
+
 
 # Author: Kristian Bonnici <kristiandaaniel@gmail.fi>
 
@@ -13,6 +15,9 @@ class PortfolioOptimizer:
     def __init__(self):
         self.data = None
         self.daily_ret = None
+        self.daily_mean = None
+        self.daily_cov = None
+        self.missing = None
         self.min_ret = None
         self.rf_ret = None
 
@@ -37,12 +42,22 @@ class PortfolioOptimizer:
         self.stock_ret = None
         self.stock_sharpe = None
 
-    def fit(self, data, obj='sharpe', ret_type='log', min_ret=0.03, rf_ret=0.01, verbosity=0):
+    def fit(self, data, obj='sharpe', ret_type='log', min_ret=0.03, rf_ret=0.01, missing='pairwise', verbosity=0):
 
         # ========== base data ==========
         self.data = data
         self.rf_ret = rf_ret
         self.min_ret = min_ret
+        self.missing = missing
+
+        # ========== missing prices ==========
+        if missing == 'ffill':
+            data = data.ffill()
+        elif missing not in ['drop', 'pairwise']:
+            raise ValueError(
+                """The provided input value for missing '{}' is not supported.
+                This input value should be one of the following: {}""".format(missing, ['drop', 'ffill', 'pairwise'])
+            )
 
         # ========== daily returns ==========
         if ret_type == 'log':
@@ -54,12 +69,23 @@ class PortfolioOptimizer:
                 """The provided input value for ret_type '{}' is not supported.
                 This input value should be one of the following: {}""".format(ret_type, ['log', 'arithmetic'])
             )
+        # first row has no previous price
+        daily_ret = daily_ret.iloc[1:]
+        if missing in ['drop', 'ffill']:
+            daily_ret = daily_ret.dropna()
         self.daily_ret = daily_ret
 
+        # ========== daily moments ==========
+        _, mean, cov = masked_moments(daily_ret.values)
+        if missing == 'pairwise':
+            cov = nearest_psd(cov)
+        self.daily_mean = pd.Series(mean, index=daily_ret.columns)
+        self.daily_cov = pd.DataFrame(cov, index=daily_ret.columns, columns=daily_ret.columns)
+
         # ========== stock data ==========
         self.stock_names = data.columns.values
-        self.stock_ret = daily_ret.mean() * 252
-        self.stock_vol = daily_ret.std() * np.sqrt(252)
+        self.stock_ret = self.daily_mean * 252
+        self.stock_vol = np.sqrt(pd.Series(np.diag(cov), index=daily_ret.columns)) * np.sqrt(252)
         self.stock_sharpe = (self.stock_ret - rf_ret) / self.stock_vol
 
         # ========== frontier returns ==========
@@ -67,7 +93,7 @@ class PortfolioOptimizer:
             if self.min_ret < min(self.stock_ret):
                 self.min_ret = min(self.stock_ret)
             self.frontier_ret = np.linspace(
-                self.min_ret, max(daily_ret.mean() * 252), 30)
+                self.min_ret, max(self.stock_ret), 30)
         else:
             raise ValueError(
                 """The provided input value for min_ret '{}' is over the maximum attainable return.
@@ -131,9 +157,9 @@ class PortfolioOptimizer:
 
     def _get_return_volatility_sharpe(self, weights):
         weights = np.array(weights)
-        ret = np.sum(self.daily_ret.mean() * weights) * 252
+        ret = np.dot(self.daily_mean.values, weights) * 252
         vol = np.sqrt(np.dot(weights.T, np.dot(
-            self.daily_ret.cov() * 252, weights)))
+            self.daily_cov.values * 252, weights)))
         sr = (ret - self.rf_ret) / vol
         return np.array([ret, vol, sr])
 
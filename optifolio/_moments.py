@@ -0,0 +1,60 @@
+"""Moment estimation for return panels with missing observations."""
+
+import numpy as np
+
+
+# Author: Kristian Bonnici <kristiandaaniel@gmail.fi>
+
+
+def masked_moments(returns):
+    """
+    Returns pairwise observation counts, means and covariances of a (T, N)
+    return matrix where missing observations are NaN.
+
+    Every statistic for a pair of assets is computed over the periods where
+    both are observed (same as pandas' pairwise-complete ``cov``), but all
+    pairs are handled at once with masked matrix products.
+    """
+    x = np.asarray(returns, dtype=float)
+    mask = ~np.isnan(x)
+    m = mask.astype(float)
+
+    counts = m.T @ m
+    if np.any(np.diag(counts) < 2):
+        raise ValueError(
+            """Each asset needs at least two observed returns.
+            Too few observations for: {}""".format(np.flatnonzero(np.diag(counts) < 2).tolist())
+        )
+
+    # shift each column by its own mean for numerical stability; covariances are shift invariant
+    shift = np.nanmean(x, axis=0)
+    x0 = np.where(mask, x - shift, 0.0)
+
+    # sums[i, j]: sum of asset i over the periods where asset j is observed
+    sums = x0.T @ m
+    cross = x0.T @ x0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = (cross - sums * sums.T / counts) / (counts - 1)
+    # pairs with less than two common observations are treated as uncorrelated
+    cov[counts < 2] = 0.0
+
+    mean = np.diag(sums) / np.diag(counts) + shift
+    return counts, mean, cov
+
+
+def nearest_psd(cov, eps=0.0):
+    """
+    Returns the covariance matrix with negative eigenvalues clipped to eps,
+    rescaled so that the original variances are preserved.
+    """
+    cov = (cov + cov.T) / 2
+    eigval, eigvec = np.linalg.eigh(cov)
+    if eigval.min() >= eps:
+        return cov
+
+    psd = (eigvec * np.maximum(eigval, eps)) @ eigvec.T
+    psd_var = np.diag(psd)
+    scale = np.sqrt(np.divide(np.diag(cov), psd_var, out=np.ones_like(psd_var), where=psd_var > 0))
+    psd = psd * np.outer(scale, scale)
+    return (psd + psd.T) / 2